@@ -1,6 +1,7 @@
 """Command-line interface for vectome."""
 
 from argparse import FileType, Namespace
+import csv
 import sys
 
 from carabiner import (
@@ -40,16 +41,17 @@ def embed(args: Namespace) -> None:
     else:
         header = list(map(str, range(vectors.shape[1])))
     
+    writer = csv.writer(args.output, delimiter="\t", lineterminator="\n")
     if header is not None:
-        print(
-            "\t".join(["query"] + header),
-            file=args.output,
-        )
-    for row, query in zip(vectors, strains):
-        print(
-            "\t".join([query] + list(map(str, row))), 
-            file=args.output,
-        )
+        writer.writerow(["query"] + header)
+    # format the whole array at once; NumPy gives the shortest round-trip
+    # form for the array's own precision, e.g. `0.088388346` for float32 
+    # rather than the float64 expansion `tolist` alone would give
+    cells = vectors.astype(str)
+    writer.writerows(
+        [query, *row] 
+        for query, row in zip(strains, cells.tolist())
+    )
     return None
 
 
@@ -60,6 +62,7 @@ def build(args: Namespace) -> None:
         group=args.group,
         check_spelling=args.spellcheck,
         force=args.force,
+        n_jobs=args.jobs,
         cache_dir=args.cache,
     )
     return None
@@ -120,6 +123,12 @@ def main() -> None:
             action="store_true",
             help="Ignore cache and rebuild.",
         ),
+        "jobs": CLIOption(
+            "--jobs", "-j",
+            type=int,
+            default=8,
+            help="Number of concurrent downloads.",
+        ),
         "spellcheck": CLIOption(
             "--spellcheck", "-s",
             action="store_true",
@@ -180,6 +189,7 @@ def main() -> None:
                     options["group"],
                     options["spellcheck"],
                     options["force"],
+                    options["jobs"],
                     options["cache"].replace(default=None),
                 ],
             ),
@@ -1,25 +1,32 @@
 """Load package data."""
 
-from typing import Any, Dict, Optional
+from typing import Mapping, Optional, Tuple
+from functools import lru_cache
 import os
+from types import MappingProxyType
 
 APPDATA_DIR = os.path.dirname(__file__)
+LANDMARKS_FILE = os.path.join(APPDATA_DIR, "landmarks.yml")
 
-def load_landmarks(
-    cache_dir: Optional[str] = None
-) -> Dict[str, Any]:
 
-    import yaml
+@lru_cache(maxsize=4)
+def _load_landmarks_cached(
+    landmarks_path: str,
+    mtime: float
+) -> Mapping[str, Tuple[str, ...]]:
+    """Parse the landmarks file once per modification time.
 
-    cache_dir = cache_dir or APPDATA_DIR
+    `mtime` is only used as part of the cache key.
 
-    landmarks_path = os.path.join(
-        APPDATA_DIR, 
-        "landmarks.yml",
-    )
+    """
+    import yaml
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:  # PyYAML built without libyaml
+        from yaml import SafeLoader
 
     with open(landmarks_path, "r") as f:
-         data = yaml.safe_load(f)
+         data = yaml.load(f, Loader=SafeLoader)
 
     info = {}
     for item in data["groups"]:
@@ -32,8 +39,18 @@ def load_landmarks(
                         to_append.append(line.rstrip())
             else:
                 to_append.append(q.rstrip())
-        info[item["name"]] = to_append
-    return info
+        info[item["name"]] = tuple(to_append)
+    # read-only, since the same object is returned to every caller
+    return MappingProxyType(info)
+
+
+def load_landmarks(
+    cache_dir: Optional[str] = None
+) -> Mapping[str, Tuple[str, ...]]:
+    return _load_landmarks_cached(
+        LANDMARKS_FILE,
+        mtime=os.path.getmtime(LANDMARKS_FILE),
+    )
 
 
 def landmark_info(
@@ -46,16 +63,25 @@ def landmark_info(
     cache_dir = cache_dir or APPDATA_DIR
     cache_dir = os.path.join(cache_dir, "landmarks")
 
+    # one directory listing rather than a stat per group
+    try:
+        with os.scandir(cache_dir) as entries:
+            group_dirs = {entry.name for entry in entries if entry.is_dir()}
+    except FileNotFoundError:
+        cache_exists, group_dirs = False, set()
+    else:
+        cache_exists = True
+
     for key in info:
         group_cache = os.path.join(cache_dir, key)
         group_manifest = os.path.join(group_cache, "manifest.json")
         info[key] = {
             "landmarks": info[key],
             "manifest file": group_manifest,
-            "built": os.path.exists(group_manifest),
+            "built": key in group_dirs and os.path.isfile(group_manifest),
         }
     info["meta"] = {
         "cache location": cache_dir,
-        "cache exists": os.path.exists(cache_dir),
+        "cache exists": cache_exists,
     }
     return info
@@ -1,17 +1,15 @@
 """Functions for editing genomes."""
 
-from typing import Iterable, Optional, Union
+from typing import Any, BinaryIO, Dict, Iterable, List, Mapping, Optional, Tuple, Union
 from functools import cache
-from hashlib import md5
+from hashlib import blake2b
+import json
 import os
 
 from carabiner import print_err
-from joblib import Memory
 
 from .caching import CACHE_DIR
 
-mem = Memory(location=CACHE_DIR, verbose=0)
-
 ATTRIBUTE_KEY_PRECEDENT = (
     "ID",
     "GeneID",
@@ -21,78 +19,204 @@ ATTRIBUTE_KEY_PRECEDENT = (
     "old_locus_tag",
     "gene_synonym",
 )
+_PRECEDENCE_RANK = {key: i for i, key in enumerate(ATTRIBUTE_KEY_PRECEDENT)}
+
+
+_N = ord("N")
+
+
+@cache
+def _mem():
+    # deferred so that importing this module doesn't load joblib or touch the cache
+    from joblib import Memory
+    return Memory(location=CACHE_DIR, verbose=0)
 
 
 def _delete_locus(
-    fasta,
+    buffers: Mapping[str, Any],
     locus: Iterable[int]
-):
-    made_edit = False
-    chr, start, stop = locus
-    deletion_size = stop - start + 1
-    for seq in fasta.sequences:
-        try:
-            this_chr = seq.name
-        except AttributeError as e:
-            raise AttributeError(f"Sequence is type {type(seq)}: {seq}")
-        if this_chr == chr:
-            seq.sequence = (
-                seq.sequence[:(start-1)]
-                + ("N" * deletion_size)
-                + seq.sequence[stop:]
-            )
-            made_edit = True
-    if not made_edit:
-        raise KeyError(f"There was no sequence called {chr} in {fasta}")
-    return fasta
+) -> Mapping[str, Any]:
+    """Mask a locus with N, in place, in a mapping of sequence name to uint8 array.
+
+    Examples
+    ========
+    >>> import numpy as np
+    >>> buffers = {"chr1": np.frombuffer(bytearray(b"ATCGATCG"), dtype=np.uint8)}
+    >>> _delete_locus(buffers, ("chr1", 2, 4))["chr1"].tobytes()
+    b'ANNNATCG'
+
+    """
+    chr, start, stop = locus[:3]
+    try:
+        buffer = buffers[chr]
+    except KeyError:
+        raise KeyError(f"There was no sequence called {chr} in {', '.join(buffers)}")
+    buffer[(start-1):stop] = _N
+    return buffers
+
+
+def _index_fasta(data) -> List[Tuple[str, int, int, int]]:
+    """Locate FASTA records in a bytes-like object without parsing sequences.
+
+    Returns
+    =======
+    list[tuple]
+        (name, header_start, sequence_start, end) offsets for each record.
+
+    Examples
+    ========
+    >>> data = b">chr1 first\\nATCG\\nAT\\n>chr2\\nGG"
+    >>> _index_fasta(data)
+    [('chr1', 0, 12, 20), ('chr2', 20, 26, 28)]
+    >>> [data[start:end] for _, start, _, end in _index_fasta(data)]
+    [b'>chr1 first\\nATCG\\nAT\\n', b'>chr2\\nGG']
+
+    """
+    records = []
+    start = data.find(b">")
+    while start != -1:
+        sequence_start = data.find(b"\n", start)
+        sequence_start = len(data) if sequence_start == -1 else sequence_start + 1
+        end = data.find(b"\n>", sequence_start - 1)
+        end = len(data) if end == -1 else end + 1
+        name = data[(start + 1):sequence_start].split(maxsplit=1)[0].decode()
+        records.append((name, start, sequence_start, end))
+        start = -1 if end == len(data) else end
+    return records
+
+
+def _write_wrapped(
+    fh: BinaryIO,
+    sequence: Any,
+    width: int = 80
+) -> None:
+    """Write a bytes-like sequence in lines of `width`, without 
+    materializing it as a string.
+
+    Examples
+    ========
+    >>> from io import BytesIO
+    >>> fh = BytesIO()
+    >>> _write_wrapped(fh, bytearray(b"ATCGATCGAT"), width=4)
+    >>> print(fh.getvalue().decode())
+    ATCG
+    ATCG
+    AT
+    <BLANKLINE>
+
+    """
+    view = memoryview(sequence)
+    for i in range(0, len(view), width):
+        fh.write(view[i:(i + width)])
+        fh.write(b"\n")
+    return None
+
+
+def _index_gff(gff) -> Dict[str, Tuple[str, int, int, str]]:
+    """Map casefolded attribute values to the first interval carrying them.
+
+    Where a value appears under several attribute keys, the key
+    earliest in `ATTRIBUTE_KEY_PRECEDENT` wins; ties go to the first
+    line in the file.
+
+    """
+    index = {}
+    for line in gff.lines:
+        columns = None
+        for key, value in line.attributes.items():
+            rank = _PRECEDENCE_RANK.get(key)
+            if rank is None or not value:
+                continue
+            value = value.casefold()
+            existing = index.get(value)
+            if existing is None or rank < existing[0]:
+                if columns is None:
+                    columns = line.columns
+                index[value] = (
+                    rank,
+                    (columns.seqid, columns.start, columns.end, key),
+                )
+    return {value: interval for value, (_, interval) in index.items()}
 
 
 def _resolve_gene(
-    gff,
+    index: Dict[str, Tuple[str, int, int, str]],
     gene_name: str,
 ):
-    intervals = [
-        (line.columns.seqid, line.columns.start, line.columns.end, key)
-        for key in ATTRIBUTE_KEY_PRECEDENT
-        for line in gff.lines
-        if key in line.attributes and line.attributes[key].casefold() == gene_name.casefold()
-    ]
-
-    if len(intervals) == 0:
-        raise ValueError(f"Searched in {gff=}, but could not find {gene_name=}")
-    print_err(f"Found {len(intervals)} intervals matching {gene_name=}")
-    interval = intervals[0]
+    try:
+        interval = index[gene_name.casefold()]
+    except KeyError:
+        raise ValueError(f"Could not find {gene_name=} in GFF attributes {ATTRIBUTE_KEY_PRECEDENT}")
     print_err(f"Taking first match for {gene_name=}: {interval}")
     return interval
 
 
+def _parse_gff_index(
+    gff_file: str,
+    mtime: float
+) -> Dict[str, Tuple[str, int, int, str]]:
+    from bioino import GffFile
+    return _index_gff(GffFile.from_file(gff_file))
+
+
+@cache
+def _load_gff_index(
+    gff_file: str,
+    mtime: float
+) -> Dict[str, Tuple[str, int, int, str]]:
+    """Parse and index a GFF file, cached on disk.
+
+    `mtime` is not used directly, but makes the cache key change 
+    whenever the GFF file is modified.
+
+    """
+    return _mem().cache(_parse_gff_index)(gff_file, mtime=mtime)
+
+
 @cache
-@mem.cache
 def _resolve_gene_loci(
     gff_file: str,
     loci: Union[str, Iterable[str]]
 ):
-    from bioino import GffFile
     if isinstance(loci, str):
         loci = [loci]
     
-    gff = GffFile.from_file(gff_file)
-    gff.lines = tuple(gff.lines)
-    intervals = []
-    
-    for gene_name in loci:
-        intervals.append(
-            _resolve_gene(
-                gff,
-                gene_name=gene_name,
-            )
-        )
-    intervals = sorted(intervals)
+    index = _load_gff_index(
+        gff_file, 
+        mtime=os.path.getmtime(gff_file),
+    )
+    intervals = sorted(
+        _resolve_gene(index, gene_name=gene_name) 
+        for gene_name in loci
+    )
     chr, start, _ = intervals[0][:3]
     _, _, end = intervals[-1][:3]
     return (chr, start, end)
 
 
+def _canonical_loci(
+    loci: Union[str, Iterable[Union[str, Iterable[Union[str, int]]]]]
+) -> Tuple[Union[str, Tuple[Union[str, int], ...]], ...]:
+    """Deduplicate and sort loci as hashable tuples, so that equivalent
+    deletion sets hit the same caches.
+
+    Examples
+    ========
+    >>> _canonical_loci("acrA")
+    ('acrA',)
+    >>> _canonical_loci(["tolC", ["fimB", "fimE"], "acrA", "tolC", ("chr1", 10, 20)])
+    ('acrA', 'tolC', ('chr1', 10, 20), ('fimB', 'fimE'))
+
+    """
+    if isinstance(loci, str):
+        loci = [loci]
+    loci = {
+        tuple(locus) if isinstance(locus, (tuple, list)) else locus
+        for locus in loci
+    }
+    return tuple(sorted(loci, key=json.dumps))
+
+
 def delete_loci(
     fasta_file: str,
     gff_file: str,
@@ -102,11 +226,7 @@ def delete_loci(
 
     cache_dir = cache_dir or CACHE_DIR
 
-    if isinstance(loci, str):
-        loci = [loci]
-    else:
-        loci = list(loci)
-    
+    loci = _canonical_loci(loci)
     loci_to_delete = []
     for locus in loci:
         if (
@@ -132,27 +252,63 @@ def delete_loci(
         else:
             raise ValueError(f"Invalid locus type {type(locus)} with length {len(locus)}: {locus}")
 
-    loci_to_delete = sorted(loci_to_delete)
+    loci_to_delete = sorted(set(map(tuple, loci_to_delete)))
 
-    _hash = md5(repr(loci_to_delete).encode()).hexdigest()
+    # JSON is a stabler canonical form than repr across Python versions
+    _hash = blake2b(
+        json.dumps(loci_to_delete, separators=(",", ":")).encode(), 
+        digest_size=16,
+    ).hexdigest()
     output_file = os.path.join(cache_dir, f"{os.path.basename(fasta_file)}_delta-{_hash}.fna")
     
     if os.path.exists(output_file):
         return output_file
     else:
-        from bioino import FastaCollection
+        import mmap
+        from tempfile import NamedTemporaryFile
+        import numpy as np
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        fasta = FastaCollection.from_file(fasta_file)
-        fasta.sequences = tuple(fasta.sequences)
-        for locus in loci_to_delete:
-            print_err(f"Deleting {locus}...")
-            fasta = _delete_locus(
-                fasta=fasta, 
-                locus=locus,
-            )  
-        print_err(f"Caching edited sequence at {output_file}...", end=" ")
-        with open(output_file, "w") as fh:
-            fasta.write(fh)
+        chrs_to_edit = {locus[0] for locus in loci_to_delete}
+        with open(fasta_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            records = _index_fasta(data)
+            missing = chrs_to_edit - {name for name, *_ in records}
+            if len(missing) > 0:
+                raise KeyError(f"There was no sequence called {', '.join(sorted(missing))} in {fasta_file}")
+            # only chromosomes with deletions are loaded, as mutable byte arrays
+            buffers = {
+                name: np.frombuffer(
+                    bytearray(data[sequence_start:end].translate(None, b"\r\n")), 
+                    dtype=np.uint8,
+                )
+                for name, _, sequence_start, end in records
+                if name in chrs_to_edit
+            }
+            for locus in loci_to_delete:
+                print_err(f"Deleting {locus}...")
+                buffers = _delete_locus(
+                    buffers=buffers, 
+                    locus=locus,
+                )
+            print_err(f"Caching edited sequence at {output_file}...", end=" ")
+            # write next to the final path and swap it in atomically, so 
+            # concurrent callers never pick up a partial file
+            with NamedTemporaryFile(
+                dir=os.path.dirname(output_file),
+                prefix=f".{os.path.basename(output_file)}.",
+                delete=False,
+            ) as fh, memoryview(data) as view:
+                try:
+                    for name, start, sequence_start, end in records:
+                        if name in buffers:
+                            fh.write(view[start:sequence_start])
+                            _write_wrapped(fh, buffers[name])
+                        else:  # untouched records are copied verbatim
+                            fh.write(view[start:end])
+                except BaseException:
+                    fh.close()
+                    os.remove(fh.name)
+                    raise
+            os.replace(fh.name, output_file)
         print_err("ok")
 
     return output_file
@@ -1,13 +1,14 @@
 """Getting and processing genome data."""
 
-from typing import Iterable, Optional, Tuple, Union
+from typing import Callable, Iterable, List, Optional, Tuple, Union
 from dataclasses import asdict, dataclass
+from functools import cache, partial
 import json
 import os
 
 from carabiner import pprint_dict, print_err
 
-from .edits import delete_loci
+from .edits import _canonical_loci, delete_loci
 from .names import _extract_species, Strain, parse_strain_label
 
 @dataclass
@@ -24,18 +25,23 @@ class GenomeInfo:
         return asdict(self)
 
 
-def name_or_taxon_to_genome_info(
+def _parse_query(
     query: Union[str, int],
-    check_spelling: bool = False,
-    cache_dir: Optional[str] = None
-):  
-    from .ncbi import download_genomic_info, name_to_taxon_ncbi, spellcheck, taxon_to_accession
-    print_err(f"Fetching {query}...")
+    check_spelling: bool = False
+) -> Tuple[str, bool, Strain, str, Optional[str]]:
+    """Parse a strain name or taxon ID ahead of taxon lookup.
+
+    Returns
+    =======
+    tuple
+        (spellchecked, did_spellcheck, strain_info, search_query, taxon_id), 
+        where `taxon_id` is None unless `query` was already a taxon ID.
+
+    """
+    from .ncbi import spellcheck
     if isinstance(query, int) or (isinstance(query, str) and query.isdigit()):
-        spellchecked = str(query)
-        check_spelling = False
-        taxon_id = spellchecked
-        strain_info = parse_strain_label(taxon_id)
+        taxon_id = str(query)
+        return taxon_id, False, parse_strain_label(taxon_id), taxon_id, taxon_id
     else:
         species, remainder = _extract_species(query)
         spellchecked = spellcheck(species) if check_spelling else species
@@ -44,29 +50,58 @@ def name_or_taxon_to_genome_info(
         for key in ("strain", "substrain"):
             if getattr(strain_info, key) is not None:
                 search_query += " " + getattr(strain_info, key)
-        taxon_id = name_to_taxon_ncbi(search_query, key="tax_id")
+        return spellchecked, check_spelling, strain_info, search_query, None
+
+
+def _resolve_accession(
+    parsed: Tuple[str, bool, Strain, str, Optional[str]],
+    taxon_id: Optional[str] = None
+) -> Tuple[str, str]:
+    """Find the taxon ID and reference genome accession of a parsed query.
+
+    Returns
+    =======
+    tuple
+        (taxon_id, accession).
+
+    """
+    from .ncbi import name_to_taxon_ncbi, taxon_to_accession
+    _, _, strain_info, search_query, parsed_taxon_id = parsed
+    # a pre-resolved `taxon_id` (e.g. from a batch lookup) skips the search
+    taxon_id = parsed_taxon_id or taxon_id or name_to_taxon_ncbi(search_query, key="tax_id")
     accession = taxon_to_accession(taxon_id)
     if accession is None:
         raise KeyError(
             f"Genome lookup {taxon_id=} {search_query=} failed: {strain_info}"
         )
-    data_files = download_genomic_info(
-        query=accession, 
-        cache_dir=cache_dir,
-    )
-    if (
-        strain_info.deletions is not None 
-        and isinstance(strain_info.deletions, list) 
-        and len(strain_info.deletions) > 0
-    ):
-        new_fasta = delete_loci(
+    return taxon_id, accession
+
+
+def _edit_genome(
+    data_files: dict,
+    deletions: Tuple[Union[str, Tuple[str, str]], ...],
+    cache_dir: Optional[str] = None
+) -> dict:
+    data_files = dict(data_files)
+    if len(deletions) > 0:
+        data_files["fasta"] = delete_loci(
             fasta_file=data_files["fasta"],
             gff_file=data_files["gff"],
-            loci=tuple(strain_info.deletions),
+            loci=deletions,
             cache_dir=cache_dir,
         )
-        data_files["fasta"] = new_fasta
-    return GenomeInfo(
+    return data_files
+
+
+def _genome_info(
+    query: Union[str, int],
+    parsed: Tuple[str, bool, Strain, str, Optional[str]],
+    taxon_id: str,
+    accession: str,
+    data_files: dict
+) -> dict:
+    spellchecked, check_spelling, strain_info, _, _ = parsed
+    genome_info = GenomeInfo(
         query=query,
         spellchecked=spellchecked,
         did_spellcheck=check_spelling,
@@ -75,14 +110,177 @@ def name_or_taxon_to_genome_info(
         accession=accession,
         files=data_files,
     ).__dict__()
+    pprint_dict(genome_info, message=f"Parsed strain name {query}:")
+    return genome_info
+
+
+def name_or_taxon_to_genome_info(
+    query: Union[str, int],
+    check_spelling: bool = False,
+    cache_dir: Optional[str] = None,
+    taxon_id: Optional[str] = None
+):  
+    from .ncbi import download_genomic_info
+    print_err(f"Fetching {query}...")
+    parsed = _parse_query(
+        query,
+        check_spelling=check_spelling,
+    )
+    taxon_id, accession = _resolve_accession(parsed, taxon_id=taxon_id)
+    data_files = download_genomic_info(
+        query=accession, 
+        cache_dir=cache_dir,
+    )
+    data_files = _edit_genome(data_files, parsed[2].deletions, cache_dir=cache_dir)
+    return _genome_info(query, parsed, taxon_id, accession, data_files)
+
+
+def _map_distinct(
+    parallel: Callable,
+    f: Callable,
+    keys: Iterable
+) -> dict:
+    """Call `f` once per distinct key with `parallel`, mapping keys to results.
+
+    Concurrent cache misses for the same key would otherwise all go
+    to the network.
+
+    """
+    from joblib import delayed
+    keys = list(dict.fromkeys(keys))
+    return dict(zip(keys, parallel(delayed(f)(key) for key in keys)))
+
+
+def _normalize_species(
+    species: str,
+    check_spelling: bool = False
+) -> str:
+    from .ncbi import spellcheck
+    spellchecked = spellcheck(species) if check_spelling else species
+    return _extract_species(spellchecked, normalize=True)[0]
+
+
+def name_or_taxon_to_genome_info_batch(
+    queries: Iterable[Union[str, int]],
+    check_spelling: bool = False,
+    n_jobs: int = 8,
+    cache_dir: Optional[str] = None
+) -> List[dict]:
+    """Fetch genome info for many queries, overlapping network requests.
+
+    Names are parsed concurrently, resolved to taxa in batched requests,
+    then genomes are fetched concurrently. Each stage only makes one 
+    call per distinct species, query, taxon, accession, or set of 
+    deletions. Results are in query order.
+
+    """
+    from joblib import Parallel
+    from .ncbi import (
+        download_genomic_info, 
+        name_to_taxon_ncbi, 
+        name_to_taxon_ncbi_batch, 
+        taxon_to_accession,
+    )
+
+    queries = list(queries)
+    # Lookups and downloads are network-bound, so threads are enough
+    # to overlap request latency.
+    parallel = Parallel(
+        n_jobs=max(1, min(len(queries), n_jobs)),
+        backend="threading",
+    )
+    # many labels share a species, so spellcheck and normalize each once;
+    # parsing below then hits the lookup caches
+    _map_distinct(
+        parallel,
+        partial(_normalize_species, check_spelling=check_spelling),
+        (
+            _extract_species(q)[0] for q in map(str, queries)
+            if not q.isdigit()
+        ),
+    )
+    # taxon IDs parse the same as ints or strings
+    parsed_by_query = _map_distinct(
+        parallel,
+        partial(_parse_query, check_spelling=check_spelling),
+        map(str, queries),
+    )
+    parsed = [parsed_by_query[str(q)] for q in queries]
+    # resolve all names to taxa in as few requests as possible, then
+    # search for any left over
+    taxon_ids = name_to_taxon_ncbi_batch(
+        search_query for _, _, _, search_query, taxon_id in parsed
+        if taxon_id is None
+    )
+    taxon_ids |= _map_distinct(
+        parallel,
+        partial(name_to_taxon_ncbi, key="tax_id"),
+        (search_query for search_query, taxon_id in taxon_ids.items() if taxon_id is None),
+    )
+    taxon_ids = [
+        parsed_taxon_id or taxon_ids[search_query] 
+        for _, _, _, search_query, parsed_taxon_id in parsed
+    ]
+    accessions = _map_distinct(parallel, taxon_to_accession, taxon_ids)
+    for p, taxon_id in zip(parsed, taxon_ids):
+        if accessions[taxon_id] is None:
+            raise KeyError(
+                f"Genome lookup {taxon_id=} search_query={p[3]!r} failed: {p[2]}"
+            )
+    downloads = _map_distinct(
+        parallel,
+        partial(download_genomic_info, cache_dir=cache_dir),
+        accessions.values(),
+    )
+    # equivalent deletion sets share an edit job
+    edit_keys = [
+        (accessions[taxon_id], _canonical_loci(p[2].deletions))
+        for p, taxon_id in zip(parsed, taxon_ids)
+    ]
+    edited = _map_distinct(
+        parallel,
+        lambda key: _edit_genome(downloads[key[0]], key[1], cache_dir=cache_dir),
+        edit_keys,
+    )
+    return [
+        _genome_info(q, p, taxon_id, accessions[taxon_id], edited[key]) 
+        for q, p, taxon_id, key in zip(queries, parsed, taxon_ids, edit_keys)
+    ]
 
 
 def fetch_landmarks(
     group: int = 0,
     check_spelling: bool = False,
     force: bool = False,
+    n_jobs: int = 8,
     cache_dir: Optional[str] = None
-):
+) -> Tuple[dict]:
+    """Get genome info for a landmark group, building it if necessary.
+
+    Results are memoized in-process, so repeated calls (e.g. once per 
+    query genome) only read the manifest once. `force` rebuilds the 
+    group and clears the memo.
+
+    """
+    if force:
+        _fetch_landmarks.cache_clear()
+    return _fetch_landmarks(
+        group=group,
+        check_spelling=check_spelling,
+        force=force,
+        n_jobs=n_jobs,
+        cache_dir=cache_dir,
+    )
+
+
+@cache
+def _fetch_landmarks(
+    group: int = 0,
+    check_spelling: bool = False,
+    force: bool = False,
+    n_jobs: int = 8,
+    cache_dir: Optional[str] = None
+) -> Tuple[dict]:
     from .data import load_landmarks, APPDATA_DIR
 
     landmarks_info = load_landmarks()
@@ -104,18 +302,34 @@ def fetch_landmarks(
     else:
         os.makedirs(cache_dir, exist_ok=True)
 
-        results = []
-        for q in group_queries:
-            results.append(name_or_taxon_to_genome_info(
-                query=q,
-                check_spelling=check_spelling,
-                cache_dir=cache_dir,
-            ))
-            pprint_dict(results[-1], message="Parsed strain name:")
+        results = name_or_taxon_to_genome_info_batch(
+            group_queries,
+            check_spelling=check_spelling,
+            n_jobs=n_jobs,
+            cache_dir=cache_dir,
+        )
         with open(manifest_filename, "w") as f:
             json.dump(results, f, indent=4)
         
-    return results
+    return tuple(results)
+
+
+@cache
+def _get_landmark_ids(
+    group: int,
+    check_spelling: bool,
+    id_keys: Tuple[Union[int, str]],
+    cache_dir: Optional[str] = None
+) -> Tuple[str]:
+    landmark_info = fetch_landmarks(
+        check_spelling=check_spelling,
+        group=group,
+        cache_dir=cache_dir,
+    )
+    return tuple(
+        ":".join(str(info[key]) for key in id_keys)
+        for info in landmark_info
+    )
 
 
 def get_landmark_ids(
@@ -125,14 +339,18 @@ def get_landmark_ids(
     force: bool = False,
     cache_dir: Optional[str] = None
 ):
-    id_keys = id_keys or ("query", "taxon_id", "accession")
-    landmark_info = fetch_landmarks(
-        check_spelling=check_spelling,
+    id_keys = tuple(id_keys or ("query", "taxon_id", "accession"))
+    if force:
+        fetch_landmarks(
+            check_spelling=check_spelling,
+            group=group,
+            force=force,
+            cache_dir=cache_dir,
+        )
+        _get_landmark_ids.cache_clear()
+    return list(_get_landmark_ids(
         group=group,
-        force=force,
+        check_spelling=check_spelling,
+        id_keys=id_keys,
         cache_dir=cache_dir,
-    )
-    return [
-        ":".join(str(info[key]) for key in id_keys)
-        for info in landmark_info
-    ]
+    ))
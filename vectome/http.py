@@ -1,35 +1,172 @@
 """Fetching remote data."""
 
-from typing import Any, Callable, Mapping, Optional
-from functools import cache, wraps
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, TYPE_CHECKING
+from collections import deque
+from functools import cache, lru_cache, wraps
 import os
+from threading import Lock
 import time
+from urllib.parse import urlparse
 
 from carabiner import print_err, pprint_dict
 from carabiner.decorators import decorator_with_params
-import requests
-from requests import Response
+
+if TYPE_CHECKING:
+    from requests import Response, Session
+
+# calls per second allowed by hosts with limits below the default;
+# NCBI E-utilities allow 3/s without an API key
+_HOST_MAX_CALLS: Dict[str, int] = {
+    "eutils.ncbi.nlm.nih.gov": 3,
+}
+_HOST_LIMITERS: Dict[str, Callable[[], None]] = {}
+_HOST_LIMITERS_LOCK = Lock()
+
+
+@cache
+def _session(
+    max_tries: int = 3,
+    pool_size: int = 16
+) -> "Session":
+    """Get a shared keep-alive session which retries transient failures.
+
+    Sessions are cached so that all endpoints with the same settings
+    reuse one connection pool.
+
+    """
+    from requests import Session
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=max_tries,
+        backoff_factor=.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False,  # leave it to `raise_for_status`
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retry,
+    )
+    session = Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _freeze_params(
+    params: Optional[Mapping[str, Any]] = None
+) -> Optional[Tuple[Tuple[str, Any], ...]]:
+    """Convert query parameters into a canonical, hashable form.
+
+    Examples
+    ========
+    >>> _freeze_params({"b": ["x", "y"], "a": 1})
+    (('a', 1), ('b', ('x', 'y')))
+    >>> _freeze_params() is None
+    True
+
+    """
+    if params is None:
+        return None
+    return tuple(sorted(
+        (key, tuple(value) if isinstance(value, (list, set)) else value)
+        for key, value in params.items()
+    ))
+
+
+def _rate_limiter(
+    max_calls: int = 5,
+    period: float = 1.
+) -> Callable[[], None]:
+    """Make a thread-safe sliding-window rate limiter.
+
+    The returned function blocks until fewer than `max_calls` calls
+    have been made in the last `period` seconds, so bursts of up to
+    `max_calls` go through immediately.
+
+    Examples
+    ========
+    >>> wait = _rate_limiter(max_calls=2, period=.5)
+    >>> start = time.monotonic()
+    >>> for _ in range(3):
+    ...     wait()
+    >>> time.monotonic() - start >= .5
+    True
+
+    """
+    calls = deque(maxlen=max_calls)
+    lock = Lock()
+
+    def wait() -> None:
+        with lock:
+            now = time.monotonic()
+            if len(calls) == calls.maxlen:
+                delay = period - (now - calls[0])
+                if delay > 0:
+                    time.sleep(delay)
+                    now = time.monotonic()
+            calls.append(now)
+        return None
+
+    return wait
+
+
+def _host_rate_limiter(
+    url: str,
+    max_calls: Optional[int] = None,
+    period: float = 1.
+) -> Callable[[], None]:
+    """Get the rate limiter shared by all endpoints on the host of `url`.
+
+    Limits apply to a host as a whole, so endpoints which are called
+    concurrently share one budget. The first endpoint registered for a
+    host sets its limit; `max_calls` defaults to the entry in
+    `_HOST_MAX_CALLS`, or 5.
+
+    Examples
+    ========
+    >>> a = _host_rate_limiter("https://example.org/a/{query}")
+    >>> b = _host_rate_limiter("https://example.org/b")
+    >>> a is b, a is _host_rate_limiter("https://example.com/a")
+    (True, False)
+
+    """
+    host = urlparse(url).netloc
+    with _HOST_LIMITERS_LOCK:
+        if host not in _HOST_LIMITERS:
+            if max_calls is None:
+                max_calls = _HOST_MAX_CALLS.get(host, 5)
+            _HOST_LIMITERS[host] = _rate_limiter(
+                max_calls=max_calls, 
+                period=period,
+            )
+        return _HOST_LIMITERS[host]
 
 
 @decorator_with_params
 def api_get(
-    f: Callable[[str, Response], Any],
+    f: Callable[[str, "Response"], Any],
     url: str,
     max_tries: int = 3,
     query_key: Optional[str] = None,
     default_params: Optional[Mapping[str, Any]] = None,
+    max_calls: Optional[int] = None,
+    period: float = 1.,
+    timeout: float = 30.,
+    stream: bool = False,
     cache_dir: Optional[str] = None
 ) -> Callable[[Optional[str], Optional[dict]], Any]:
     default_params = default_params or {}
     url0 = url
+    wait_for_slot = _host_rate_limiter(url, max_calls=max_calls, period=period)
 
     def api_call(
         query=None, 
         params=None,
-        _try: int = 0,
         *args, **kwargs
     ):
-        time.sleep(.2)
         params = default_params | (params or {})
         url = url0
         if query_key is not None and query is not None:
@@ -40,20 +177,15 @@ def api_get(
             params,
             message=f"Downloading from {url} with the following parameters"
         )
-        try:
-            r = requests.get(url, params=params)
-        except requests.exceptions.ConnectionError as e:
-            next_try = _try + 1
-            if next_try < max_tries:
-                return api_call(
-                    query=query, 
-                    params=params,
-                    _try=next_try,
-                    *args, **kwargs
-                )
-            else:
-                raise e
-        else:
+        # only reached on cache misses, so cached replays are not throttled
+        wait_for_slot()
+        # with `stream`, the body is only read as `f` consumes it
+        with _session(max_tries=max_tries).get(
+            url, 
+            params=params, 
+            timeout=timeout, 
+            stream=stream,
+        ) as r:
             print_err(f"Trying {r.url}", end="")
             r.raise_for_status()
             print_err(f"... {r.status_code} ok")
@@ -61,7 +193,25 @@ def api_get(
 
     if cache_dir is not None and isinstance(cache_dir, str):
         from joblib import Memory
-        mem = Memory(location=os.path.join(cache_dir, "api_calls"), verbose=0)
+        # joblib keys on the closure's code, which every endpoint shares,
+        # so each endpoint needs its own location
+        mem = Memory(
+            location=os.path.join(cache_dir, "api_calls", f.__name__), 
+            verbose=0,
+        )
         api_call = mem.cache(api_call)
+
+    # `params` is a dict, so it must be frozen into the in-memory cache key
+    @lru_cache(maxsize=4096)
+    def _cached_call(query, params_items, *args, **kwargs):
+        return api_call(
+            query, 
+            None if params_items is None else dict(params_items),
+            *args, **kwargs
+        )
+
+    @wraps(f)
+    def entry(query=None, params=None, *args, **kwargs):
+        return _cached_call(query, _freeze_params(params), *args, **kwargs)
         
-    return wraps(f)(cache(api_call))
+    return entry
@@ -1,19 +1,45 @@
-from typing import List, Optional, Tuple, Union
+from typing import Container, List, Optional, Tuple, Union
 from dataclasses import dataclass, field
+from functools import lru_cache
 import re
 
 from .ncbi import name_to_taxon_ncbi
 
+# --- Patterns ---
+_OPERON_RE = re.compile(r"([a-z]{3})([A-Z]{2,})")
+_SPECIES_RE = re.compile(r"^\s*(?P<genus>[A-Z][a-z]*|[A-Z]\.)\s+(?P<species>[a-z][a-z_-]+)\b")
+_SUBSTRAIN_RE = re.compile(
+    r"\b(?:substr(?:ain)?\.?|subsp\.?|variant)\s+([A-Za-z0-9._-]+)", 
+    flags=re.IGNORECASE,
+)
+_STRAIN_RE = re.compile(
+    r"\b(?:strain|str\.|serovar\.?)\s+(ATCC\s[0-9]+|[A-Za-z0-9._-]+)\b", 
+    flags=re.IGNORECASE,
+)
+_STRAIN_FALLBACK_RE = re.compile(r"\b([A-Za-z]\-[0-9]+|[A-Za-z0-9]{2,})\b")
+_STRAIN_LIKE_RE = re.compile(r"^[A-Za-z]\-\d+$")
+_NICKNAME_LIKE_RE = re.compile(r"^[A-Z][A-Za-z0-9._-]{2,}$")
+_SUBSTRAIN_FALLBACK_RE = re.compile(r"\b([A-Za-z0-9._-]{3,})\b")
+_SUBSTRAIN_LIKE_RE = re.compile(r"^[A-Z]{0,2}\d*[A-Za-z0-9._-]+$")
+_OPERON_LIKE_RE = re.compile(r"^[a-z]+[A-Z]{2,}$")
+_KO_RE = re.compile(r"\b([A-Za-z][A-Za-z0-9._-]{1,})::[A-Za-z0-9._-]{2,}\b")
+_DELTA_RE = re.compile(
+    r"(?:Δ|delta|del)[\s-]*\(?([A-Za-z0-9_]+)(?:-([A-Za-z0-9._-]+))?\)?",
+    flags=re.IGNORECASE,
+)
+_OPERON_TAIL_RE = re.compile(r"\b([a-z]+[A-Z]{2,})-?\b")
+_MUT_RE = re.compile(r"\b([A-Za-z][A-Za-z0-9_]*\d+[A-Z0-9_]*)\b")
+
 # --- Helpers ---
-@dataclass
+@dataclass(frozen=True)
 class Strain:
     query: str
     species: str
     remainder: str
     strain: Optional[str] = field(default=None)
     substrain: Optional[str] = field(default=None)
-    deletions: Optional[List[Union[str, List[str]]]] = field(default_factory=list)
-    mutations: Optional[List[str]] = field(default_factory=list)
+    deletions: Tuple[Union[str, Tuple[str, str]], ...] = field(default=())
+    mutations: Tuple[str, ...] = field(default=())
 
 
 def _strip_punctuation(s: str) -> str:
@@ -28,8 +54,17 @@ def _split_operon(query: str) -> List[str]:
     list[str]
         Gene names.
 
+    Examples
+    ========
+    >>> _split_operon("acrAB")
+    ['acrA', 'acrB']
+    >>> _split_operon("araBAD")
+    ['araB', 'araA', 'araD']
+    >>> _split_operon("tolC")
+    ['tolC']
+
     """
-    m = re.fullmatch(r"([a-z]{3})([A-Z]{2,})", query)
+    m = _OPERON_RE.fullmatch(query)
     if not m:
         return [query]
     base, caps = m.groups()
@@ -50,10 +85,7 @@ def _extract_species(
     """
     query = query.strip()
     # e.g., "E. coli", "Escherichia coli", allow extra words after species
-    m = re.match(
-        r"^\s*(?P<genus>[A-Z][a-z]*|[A-Z]\.)\s+(?P<species>[a-z][a-z_-]+)\b", 
-        query,
-    )
+    m = _SPECIES_RE.match(query)
     if not m:
         return query, ""
     genus = m.group("genus")
@@ -78,51 +110,48 @@ def _extract_strain_and_substrain(query: str) -> Tuple[Optional[str], Optional[s
     """
     strain, substrain = None, None
 
+    # matches are cut without stripping: removing text never moves leading
+    # or trailing whitespace inwards, so one strip at the end is equivalent
+    cut = False
+
     # substrain indicators
-    m = re.search(
-        r"\b(?:substr(?:ain)?\.?|subsp\.?|variant)\s+([A-Za-z0-9._-]+)", 
-        query, 
-        flags=re.IGNORECASE,
-    )
+    m = _SUBSTRAIN_RE.search(query)
     if m:
         substrain = _strip_punctuation(m.group(1))
-        query = (query[:m.start()] + query[m.end():]).strip()
+        query = query[:m.start()] + query[m.end():]
+        cut = True
 
     # strain indicators
-    m = re.search(
-        r"\b(?:strain|str\.|serovar\.?)\s+(ATCC\s[0-9]+|[A-Za-z0-9._-]+)\b", 
-        query, 
-        flags=re.IGNORECASE,
-    )
+    m = _STRAIN_RE.search(query)
     if m:
         strain = _strip_punctuation(m.group(1))
-        query = (query[:m.start()] + query[m.end():]).strip()
+        query = query[:m.start()] + query[m.end():]
+        cut = True
 
     # fallback: common alphanumeric early in the string
     if strain is None:
-        m = re.search(
-            r"\b([A-Za-z]\-[0-9]+|[A-Za-z0-9]{2,})\b", 
-            query,
-        )
+        m = _STRAIN_FALLBACK_RE.search(query)
         if m:
             candidate = _strip_punctuation(m.group(1))
             # Heuristic: treat as strain if it looks like K-12 or a lab nickname, and is not a gene token
-            if re.match(r"^[A-Za-z]\-\d+$", candidate) or re.match(r"^[A-Z][A-Za-z0-9._-]{2,}$", candidate):
+            if _STRAIN_LIKE_RE.match(candidate) or _NICKNAME_LIKE_RE.match(candidate):
                 strain = candidate
-                query = (query[:m.start()] + query[m.end():]).strip()
+                query = query[:m.start()] + query[m.end():]
+                cut = True
 
     # second token as substrain if we saw two alphanum tokens in a row (e.g., "K-12 MG1655")
     if substrain is None:
-        m = re.search(r"\b([A-Za-z0-9._-]{3,})\b", query)
+        m = _SUBSTRAIN_FALLBACK_RE.search(query)
         if m:
             candidate = _strip_punctuation(m.group(1))
-            if re.match(r"^[A-Z]{0,2}\d*[A-Za-z0-9._-]+$", candidate) and not re.match(r"^[a-z]+[A-Z]{2,}$", candidate):
+            if _SUBSTRAIN_LIKE_RE.match(candidate) and not _OPERON_LIKE_RE.match(candidate):
                 # avoid operon-like acrAB
                 if strain and candidate != strain:
                     substrain = candidate
-                    query = (query[:m.start()] + query[m.end():]).strip()
+                    query = query[:m.start()] + query[m.end():]
+                    cut = True
 
-    return strain, substrain, query
+    return strain, substrain, query.strip() if cut else query
 
 
 def _parse_deletions(query: str) -> List[Union[str, Tuple[str, str]]]:
@@ -132,53 +161,62 @@ def _parse_deletions(query: str) -> List[Union[str, Tuple[str, str]]]:
       - KO insertions: tolC::FRT (treat as tolC deletion)
       - operon shorthand with trailing '-' : acrAB- -> ['acrA','acrB']
 
+    Each pattern scans the whole query, so overlapping matches
+    all contribute, e.g. a range whose endpoint is also operon shorthand.
+
     returns
     =======
     list
         Gene names.
 
+    Examples
+    ========
+    >>> _parse_deletions("gyrA96 acrAB- Δ(fimB-fimE) ΔompF tolC::FRT")
+    ['acrA', 'acrB', ('fimB', 'fimE'), 'ompF', 'tolC']
+    >>> _parse_deletions("Δ(acrAB-tolC)")
+    ['acrA', ('acrAB', 'tolC'), 'acrB']
+    >>> _parse_deletions("del-araBAD")
+    ['araA', 'araB', 'araD']
+
     """
     deletions: List[Union[str, Tuple[str, str]]] = []
 
+    # cheap substring checks let most labels skip whole regex scans
+    folded = query.casefold()
+
     # KO insertions "gene::something"
-    for m in re.finditer(
-        r"\b([A-Za-z][A-Za-z0-9._-]{1,})::[A-Za-z0-9._-]{2,}\b", 
-        query,
-    ):
-        deletions.append(m.group(1))
+    if "::" in query:
+        for m in _KO_RE.finditer(query):
+            deletions.append(m.group(1))
 
     # Explicit Δ / delta / del
-    for m in re.finditer(
-        r"(?:Δ|delta|del)[\s-]*\(?([A-Za-z0-9_]+)(?:-([A-Za-z0-9._-]+))?\)?",
-        query, 
-        flags=re.IGNORECASE,
-    ):
-        a = _strip_punctuation(m.group(1))
-        b = _strip_punctuation(m.group(2)) if m.group(2) else None
-        if b:
-            deletions.append((a, b))
-        else:
-            # Handle operon shorthand inside Δ token (e.g., ΔacrAB-)
-            genes = _split_operon(a)
-            deletions.extend(genes)
+    if "δ" in folded or "del" in folded:
+        for m in _DELTA_RE.finditer(query):
+            a = _strip_punctuation(m.group(1))
+            b = _strip_punctuation(m.group(2)) if m.group(2) else None
+            if b:
+                deletions.append((a, b))
+            else:
+                # Handle operon shorthand inside Δ token (e.g., ΔacrAB-)
+                genes = _split_operon(a)
+                deletions.extend(genes)
 
     # Standalone operon shorthand with trailing '-' (e.g., 'acrAB-')
-    for m in re.finditer(
-        r"\b([a-z]+[A-Z]{2,})-?\b",
-        query,
-    ):
+    for m in _OPERON_TAIL_RE.finditer(query):
         genes = _split_operon(m.group(1))
         deletions.extend(genes)
 
-    normed = []
-    for d in set(deletions):
+    # dict as an insertion-ordered set: one dedup pass, and ties in the 
+    # sort below keep a deterministic order
+    normed = {}
+    for d in deletions:
         if isinstance(d, tuple):
             a, b = d
-            normed.append((_normalize_gene(a), _normalize_gene(b)))
+            normed[(_normalize_gene(a), _normalize_gene(b))] = None
         else:
-            normed.append(_normalize_gene(d))
+            normed[_normalize_gene(d)] = None
 
-    return sorted(set(normed), key=lambda x: x[0] if isinstance(x, tuple) else x)
+    return sorted(normed, key=lambda x: x[0] if isinstance(x, tuple) else x)
 
 
 def _normalize_gene(query: str) -> str:
@@ -187,17 +225,23 @@ def _normalize_gene(query: str) -> str:
 
 def _parse_mutations(
     query: str, 
-    exclude: List[str]
+    exclude: Container[str] = frozenset()
 ) -> List[str]:
     """Very lightweight mutation token grabber, e.g. 'gyrA96', 'rpoB_S531L'.
 
     Excludes any tokens already classified as deletions.
+
+    Examples
+    ========
+    >>> _parse_mutations("gyrA96 rpoB_S531L ompF2 gyrA96", exclude=["ompF2"])
+    ['gyrA96', 'rpoB_S531L']
+
     """
+    # constant-time membership for every candidate token
+    if not isinstance(exclude, (set, frozenset)):
+        exclude = frozenset(exclude)
     mutations = []
-    for m in re.finditer(
-        r"\b([A-Za-z][A-Za-z0-9_]*\d+[A-Z0-9_]*)\b", 
-        query,
-    ):
+    for m in _MUT_RE.finditer(query):
         candidate = _strip_punctuation(m.group(1))
         if candidate not in exclude:
             mutations.append(candidate)
@@ -213,26 +257,34 @@ def parse_strain_label(
 
     Parameters
     ==========
-    query : str
-        Free text strain name.
+    query : str or int
+        Free text strain name, or an NCBI taxon ID.
 
     Returns
     =======
     Strain
+        Parsed components. Results are cached, so the same (immutable)
+        instance is returned for repeated queries.
 
     Examples
     ========
     >>> parse_strain_label("E. coli K-12 substr. MG1655 gyrA96 acrAB- Δ(fimB-fimE) ΔompF tolC::FRT")
-    Strain(query='E. coli K-12 substr. MG1655 gyrA96 acrAB- Δ(fimB-fimE) ΔompF tolC::FRT', species='Escherichia coli', remainder='gyrA96 acrAB- Δ(fimB-fimE) ΔompF tolC::FRT', strain='K-12', substrain='MG1655', deletions=['acrA', 'acrB', ('fimB', 'fimE'), 'ompF', 'tolC'], mutations=['gyrA96'])
+    Strain(query='E. coli K-12 substr. MG1655 gyrA96 acrAB- Δ(fimB-fimE) ΔompF tolC::FRT', species='Escherichia coli', remainder='gyrA96 acrAB- Δ(fimB-fimE) ΔompF tolC::FRT', strain='K-12', substrain='MG1655', deletions=('acrA', 'acrB', ('fimB', 'fimE'), 'ompF', 'tolC'), mutations=('gyrA96',))
     >>> parse_strain_label("S. enterica serovar Typhimurium")
-    Strain(query='S. enterica serovar Typhimurium', species='Salmonella enterica', remainder='', strain='Typhimurium', substrain=None, deletions=[], mutations=[])
+    Strain(query='S. enterica serovar Typhimurium', species='Salmonella enterica', remainder='', strain='Typhimurium', substrain=None, deletions=(), mutations=())
     >>> parse_strain_label("S. aureus RN4220 Δspa")
-    Strain(query='S. aureus RN4220 Δspa', species='Staphylococcus aureus', remainder='Δspa', strain='RN4220', substrain=None, deletions=['spa'], mutations=[])
+    Strain(query='S. aureus RN4220 Δspa', species='Staphylococcus aureus', remainder='Δspa', strain='RN4220', substrain=None, deletions=('spa',), mutations=())
     >>> parse_strain_label(83332)
-    Strain(query='Mycobacterium tuberculosis H37Rv', species='Mycobacterium tuberculosis', remainder='', strain='H37Rv', substrain=None, deletions=[], mutations=[])
+    Strain(query='Mycobacterium tuberculosis H37Rv', species='Mycobacterium tuberculosis', remainder='', strain='H37Rv', substrain=None, deletions=(), mutations=())
 
     """
-    if isinstance(query, int) or (isinstance(query, str) and query.isdigit()):
+    # canonical string key, so 83332 and "83332" share a cache entry
+    return _parse_strain_label(str(query))
+
+
+@lru_cache(maxsize=4096)
+def _parse_strain_label(query: str) -> Strain:
+    if query.isdigit():
         query = name_to_taxon_ncbi(query, key="sci_name")
     species, remainder = _extract_species(query, normalize=True)
     strain, substrain, remainder = _extract_strain_and_substrain(remainder)
@@ -245,7 +297,7 @@ def parse_strain_label(
             to_exclude.add(d)
     mutations = _parse_mutations(
         remainder, 
-        exclude=list(to_exclude),
+        exclude=frozenset(to_exclude),
     )
 
     return Strain(
@@ -254,6 +306,6 @@ def parse_strain_label(
         species=species,
         strain=strain,
         substrain=substrain,
-        deletions=deletions,
-        mutations=mutations,
+        deletions=tuple(deletions),
+        mutations=tuple(mutations),
     )
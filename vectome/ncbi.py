@@ -1,6 +1,6 @@
 """Fetching remote data."""
 
-from typing import Iterable, List, Optional, Union
+from typing import Dict, Iterable, List, Optional, Union
 from io import BytesIO
 import json
 import os
@@ -35,6 +35,7 @@ def spellcheck(query, r) -> str:
         "hydrated": "FULLY_HYDRATED",
         "filename": "ncbi-dataset.zip",
     },
+    stream=True,
     cache_dir=NCBI_CACHE,
 )
 def download_genomic_info(
@@ -43,31 +44,40 @@ def download_genomic_info(
     cache_dir: Optional[str] = None,
 ) -> List[str]:
 
+    import shutil
+    from tempfile import NamedTemporaryFile, TemporaryFile
     from zipfile import ZipFile
+
     cache_dir = cache_dir or CACHE_DIR
-    z = ZipFile(BytesIO(r.content))
-
-    contents = z.namelist() 
-    files = {
-        "fasta": [
-            z.extract(f, path=cache_dir) for f in contents
-            if f.endswith(".fna")
-        ][0],
-        "gff": [
-            z.extract(f, path=cache_dir) for f in contents
-            if f.endswith(".gff")
-        ][0],
-    }
-
-    # normalize filenames
+    os.makedirs(cache_dir, exist_ok=True)
     normalized_files = {}
-    for key, f in files.items():
-        _, ext = os.path.splitext(f)
-        destination = os.path.join(cache_dir, f"{query}{ext}")
-        print_err(f"Saving {f} at {destination}")
-        os.rename(f, destination)
-        normalized_files[key] = destination
-    os.rmdir(os.path.dirname(f))
+    # spool the download to disk rather than holding the whole archive in memory
+    with TemporaryFile() as tmp:
+        for chunk in r.iter_content(chunk_size=1 << 20):
+            tmp.write(chunk)
+        tmp.seek(0)
+        with ZipFile(tmp) as z:
+            contents = z.namelist()
+            for key, ext in (("fasta", ".fna"), ("gff", ".gff")):
+                # only extract the members we need; write next to the final
+                # path and swap it in atomically, so concurrent readers of
+                # an earlier download never see a partial file
+                member = [f for f in contents if f.endswith(ext)][0]
+                destination = os.path.join(cache_dir, f"{query}{ext}")
+                print_err(f"Saving {member} at {destination}")
+                with z.open(member) as src, NamedTemporaryFile(
+                    dir=cache_dir, 
+                    prefix=f".{query}{ext}.",
+                    delete=False,
+                ) as dst:
+                    try:
+                        shutil.copyfileobj(src, dst, length=1 << 20)
+                    except BaseException:
+                        dst.close()
+                        os.remove(dst.name)
+                        raise
+                os.replace(dst.name, destination)
+                normalized_files[key] = destination
 
     return normalized_files
 
@@ -119,6 +129,64 @@ def name_to_taxon_ncbi(query, r, key: str = "tax_id", rank: Optional[str] = None
         return results[0].get(key)
 
 
+@api_get(
+    url="https://api.ncbi.nlm.nih.gov/datasets/v2/taxonomy/taxon/{query}",
+    cache_dir=NCBI_CACHE,
+)
+def _names_to_taxa_ncbi(query, r) -> Dict[str, str]:
+    results = {}
+    for node in r.json().get("taxonomy_nodes", []):
+        try:
+            taxonomy = node["taxonomy"]
+            tax_id = taxonomy["tax_id"]
+            organism_name = taxonomy["organism_name"]
+            rank = taxonomy["rank"]
+        except KeyError:  # unmatched names come back as errors
+            continue
+        # `taxon_suggest` is filtered to species with genomes, so only
+        # take exact matches it would also rank first
+        has_genome = any(
+            count.get("type") == "COUNT_TYPE_ASSEMBLY" and int(count.get("count", 0)) > 0
+            for count in taxonomy.get("counts", [])
+        )
+        if rank.casefold() != "species" or not has_genome:
+            continue
+        for name in node.get("query", []):
+            if name.casefold() == organism_name.casefold():
+                results[name.casefold()] = str(tax_id)
+    return results
+
+
+def name_to_taxon_ncbi_batch(
+    names: Iterable[str],
+    batch_size: int = 50
+) -> Dict[str, Optional[str]]:
+    """Resolve many exact species names to NCBI taxon IDs.
+
+    Names are looked up together, `batch_size` per request. Only
+    exact scientific names of species with genome assemblies are
+    resolved; anything else (e.g. names with strain designations)
+    maps to None, to be resolved with `name_to_taxon_ncbi`.
+
+    Returns
+    =======
+    dict
+        Map of each name to its taxon ID, or None if not resolved.
+
+    """
+    from requests.exceptions import RequestException
+
+    names = list(dict.fromkeys(names))
+    found = {}
+    for i in range(0, len(names), batch_size):
+        batch = names[i:(i + batch_size)]
+        try:
+            found |= _names_to_taxa_ncbi(",".join(batch))
+        except RequestException as e:
+            print_err(f"Batch taxon lookup failed, leaving single lookups: {e}")
+    return {name: found.get(name.casefold()) for name in names}
+
+
 @api_get(
     url="https://rest.uniprot.org/proteomes/search",
     default_params={
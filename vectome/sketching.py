@@ -1,7 +1,8 @@
 """"""
 
 from typing import Optional
-from functools import cache
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache, partial
 import os
 
 from carabiner import print_err
@@ -63,6 +64,7 @@ def sketch_landmarks(
     group: int = 0,
     check_spelling: bool = False,
     force: bool = False,
+    n_jobs: int = 8,
     cache_dir: Optional[str] = None
 ):
     from tqdm.auto import tqdm
@@ -72,6 +74,7 @@ def sketch_landmarks(
         check_spelling=check_spelling,
         group=group,
         force=force,
+        n_jobs=n_jobs,
         cache_dir=cache_dir,
     )
 
@@ -79,10 +82,14 @@ def sketch_landmarks(
         info["files"]["fasta"] 
         for info in landmark_info
     ]
-    return [
-        sketch_genome(
-            file=f,
-            force=force,
-            cache_dir=cache_dir,
-        ) for f in tqdm(landmarks, desc="Sketching landmarks")
-    ]
+    # sketching is CPU-bound, so use processes; workers share results 
+    # through the cached signature files rather than `@cache`
+    with ProcessPoolExecutor(max_workers=max(1, min(len(landmarks), os.cpu_count() or 1))) as executor:
+        return list(tqdm(
+            executor.map(
+                partial(sketch_genome, force=force, cache_dir=cache_dir),
+                landmarks,
+            ),
+            total=len(landmarks),
+            desc="Sketching landmarks",
+        ))
@@ -1,20 +1,25 @@
 """Convert species names into vectors."""
 
-from typing import Iterable, Optional, Union
+from typing import Iterable, Optional, Tuple, Union
 from functools import cache
-import hashlib
 import os
 
 from bioino import FastaCollection
 from carabiner import cast, print_err
+import numpy as np
+from numpy.random import default_rng
 from sourmash import MinHash
 from tqdm.auto import tqdm
 
 from .caching import CACHE_DIR
-from .genomes import fetch_landmarks, name_or_taxon_to_genome_info
+from .genomes import fetch_landmarks, name_or_taxon_to_genome_info_batch
 from .sketching import sketch_genome
 
 
+_SIGN_SALT = 0xC2B2AE3D27D4EB4F
+_SIGN_MULTIPLIER = 0x165667B19E3779F9
+
+
 def _mix_u64(x: int) -> int:
     """64-bit mix function (xorshift* / splitmix-like) to derive secondary hashes
     deterministically from a base 64-bit integer. 
@@ -41,6 +46,25 @@ def _mix_u64(x: int) -> int:
     return x & 0xFFFFFFFFFFFFFFFF
 
 
+def _mix_u64_array(x):
+    """Vectorized `_mix_u64` over a NumPy uint64 array.
+
+    Examples
+    ========
+    >>> import numpy as np
+    >>> x = np.array([0, 1, 0x123456789ABCDEF0], dtype=np.uint64)
+    >>> [int(y) for y in _mix_u64_array(x)] == [_mix_u64(int(y)) for y in x]
+    True
+
+    """
+    x = x ^ (x >> np.uint64(33))
+    x = x * np.uint64(0xff51afd7ed558ccd)  # uint64 arithmetic wraps, like `& MASK`
+    x ^= (x >> np.uint64(33))
+    x *= np.uint64(0xc4ceb9fe1a85ec53)
+    x ^= (x >> np.uint64(33))
+    return x
+
+
 def _bucket_index(h: int, dim: int, salt: int) -> int:
     """Deterministic bucket index in [0, dim).
     
@@ -52,11 +76,11 @@ def _bucket_index(h: int, dim: int, salt: int) -> int:
     >>> # _bucket_index/_bucket_sign are deterministic and stable
     >>> h = _mix_u64(0x1234)
     >>> h, _bucket_index(h, 1024, 0), _bucket_sign(h, 0)
-    (11969492833970939502, 635, 1)
+    (11969492833970939502, 635, -1)
     >>> _bucket_index(h, 1024, 1), _bucket_sign(h, 1)
     (580, -1)
     >>> _bucket_index(h, 10, 2), _bucket_sign(h, 2)
-    (3, -1)
+    (3, 1)
 
     """
     y = (h ^ ((salt + 1) * 0x9E3779B97F4A7C15)) & 0xFFFFFFFFFFFFFFFF
@@ -64,13 +88,38 @@ def _bucket_index(h: int, dim: int, salt: int) -> int:
 
 
 def _bucket_sign(h: int, salt: int) -> int:
-    """Deterministic sign bit (+1/-1) derived from SHA1(h || salt).
+    """Deterministic sign bit (+1/-1) from the top bit of a salted 
+    xor-multiply of `h`.
     
-    Using cryptographic hashing here makes the sign unbiased and stable
-    across Python versions/platforms.
+    CountSketch only needs signs that are pairwise independent of each
+    other and of the bucket index, not cryptographic ones. The multiply
+    carries every bit of `h` into the top bit, which the bucket index
+    does not use for power-of-two `dim`. Results are stable across Python 
+    versions/platforms.
+
+    Examples
+    ========
+    >>> [_bucket_sign(_mix_u64(h), 0) for h in range(8)]
+    [-1, -1, 1, -1, 1, -1, 1, -1]
+
     """
-    b = h.to_bytes(8, "little", signed=False) + salt.to_bytes(4, "little", signed=False)
-    return 1 if (int(hashlib.sha1(b).hexdigest(), 16) & 1) else -1    
+    y = ((h ^ ((salt + 1) * _SIGN_SALT)) * _SIGN_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF
+    return 1 if (y >> 63) else -1    
+
+
+@cache
+def _landmark_sketches(
+    group: int = 0,
+    k: int = 51,
+    cache_dir: Optional[str] = None
+) -> Tuple[MinHash]:
+    return tuple(
+        sketch_genome(
+            file=info["files"]["fasta"],
+            k=k,
+            cache_dir=cache_dir,
+        ) for info in fetch_landmarks(group=group, cache_dir=cache_dir)
+    )
 
 
 def _vectorize_landmark(
@@ -80,18 +129,11 @@ def _vectorize_landmark(
     cache_dir: Optional[str] = None,
     **kwargs
 ):
-    landmarks = [
-        info["files"]["fasta"] 
-        for info in fetch_landmarks(group=group, cache_dir=cache_dir)
-    ]
-    landmark_mh = [
-        sketch_genome(
-            file=f,
-            k=k,
-            cache_dir=cache_dir,
-        ) for f in landmarks
-    ]
-
+    landmark_mh = _landmark_sketches(
+        group=group,
+        k=k,
+        cache_dir=cache_dir,
+    )
     return [query_mh.similarity(lm) for lm in landmark_mh]
 
 
@@ -124,24 +166,40 @@ def _vectorize_countsketch(
     ...     def __init__(self, ints): 
     ...         self.hashes = {int(x): 1 for x in ints}
     >>> v = _vectorize_countsketch(_DummyMH([0x1234, 0xBEEF]), dim=16, num_hash_fns=3)
-    >>> len(v), float((v @ v) ** .5)  # length and unit norm
-    (16, 1.0)
+    >>> len(v), v.dtype, float((v @ v) ** .5)  # length and unit norm
+    (16, dtype('float32'), 1.0)
     >>> round(v[4], 3), round(v[10], 3), round(v[13], 3), round(v[0], 3), round(v[11], 3)
-    (-0.5, -0.5, 0.5, -0.5, 0.0)
+    (0.5, -0.5, -0.5, 0.5, 0.0)
 
     """
-    import numpy as np
-
     dim = dim or 4096
-    vector = np.zeros((dim,))
 
-    for _hash in query_mh.hashes.keys():
-        base = _hash & 0xFFFFFFFFFFFFFFFF
-        for i in range(num_hash_fns):
-            hk = _mix_u64(base ^ i)
-            idx = _bucket_index(hk, dim, i)
-            sign = _bucket_sign(hk, i)
-            vector[idx] += float(sign)
+    # all hashes x hash functions at once, shape (n_hashes, num_hash_fns)
+    hashes = np.fromiter(query_mh.hashes, dtype=np.uint64, count=len(query_mh.hashes))
+    salts = np.arange(num_hash_fns, dtype=np.uint64)
+    hk = _mix_u64_array(hashes[:, None] ^ salts[None, :])
+    salt_keys = np.array(
+        [((i + 1) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF for i in range(num_hash_fns)],
+        dtype=np.uint64,
+    )
+    idx = hk ^ salt_keys[None, :]
+    if dim & (dim - 1) == 0:  # power of two, so mask rather than divide
+        idx &= np.uint64(dim - 1)
+    else:
+        idx %= np.uint64(dim)
+    # vectorized `_bucket_sign`
+    sign_keys = np.array(
+        [((i + 1) * _SIGN_SALT) & 0xFFFFFFFFFFFFFFFF for i in range(num_hash_fns)],
+        dtype=np.uint64,
+    )
+    sign_bits = ((hk ^ sign_keys[None, :]) * np.uint64(_SIGN_MULTIPLIER)) >> np.uint64(63)
+    signs = np.where(sign_bits == 1, np.float32(1.), np.float32(-1.))
+    # scatter-add in one C loop; `np.add.at` is unbuffered and much slower
+    vector = np.bincount(
+        idx.ravel().astype(np.intp),
+        weights=signs.ravel(),
+        minlength=dim,
+    ).astype(np.float32)
 
     # L2 normalize to decouple vector length from sketch size
     vector_norm = np.linalg.norm(vector)
@@ -158,11 +216,11 @@ def vectorize(
     method: str = "countsketch",
     projection: Optional[int] = None,
     seed: int = 42,
+    n_jobs: int = -1,
     cache_dir: Optional[str] = None,
     **kwargs
 ):
-    from joblib import Memory
-    import numpy as np
+    from joblib import delayed, Memory, Parallel
 
     cache_dir = cache_dir or CACHE_DIR
     mem = Memory(
@@ -170,13 +228,11 @@ def vectorize(
         verbose=0,
     )
 
-    genome_info = [
-        name_or_taxon_to_genome_info(
-            str(q), 
-            check_spelling=check_spelling,
-            cache_dir=cache_dir,
-        ) for q in cast(query, to=list)
-    ]
+    genome_info = name_or_taxon_to_genome_info_batch(
+        [str(q) for q in cast(query, to=list)],
+        check_spelling=check_spelling,
+        cache_dir=cache_dir,
+    )
     print_err(genome_info)
 
     query_mh = [
@@ -188,31 +244,44 @@ def vectorize(
     ]
 
     if method == "landmark":
+        # build and sketch the landmark group once, before the worker
+        # threads all race to do it
+        _landmark_sketches(
+            group=kwargs.get("group", 0),
+            k=k,
+            cache_dir=cache_dir,
+        )
         fn = mem.cache(_vectorize_landmark)
     elif method == "countsketch":
         fn = mem.cache(_vectorize_countsketch)
     else:
         raise ValueError(f"Vectorization {method=} is not implemented.")
 
-    vectors = np.stack([
-        fn(
+    # queries are independent, and the kernels spend most of their time
+    # in NumPy or sourmash rather than the interpreter, so threads suffice
+    vectors = np.stack(Parallel(n_jobs=n_jobs, backend="threading")(
+        delayed(fn)(
             mh, 
             k=k,
             cache_dir=cache_dir, 
             **kwargs,
         ) 
         for mh in tqdm(query_mh, desc="Vectorizing genomes")
-    ], axis=0)
+    ), axis=0)
 
     if projection is None:
         return vectors
     else:
-        from numpy.random import default_rng
-
+        # Achlioptas projection: entries are ±sqrt(3/p) with probability
+        # 1/6 each and 0 otherwise, giving the same variance as the Gaussian
+        # projector. It is kept dense, as float32 GEMM beats sparse products
+        # at this density.
         generator = default_rng(seed=seed)
-        projector = generator.normal(
-            scale=1. / np.sqrt(projection), 
+        scale = np.sqrt(3. / projection)
+        projector = generator.choice(
+            np.array([-scale, 0., scale], dtype=np.float32),
             size=(vectors.shape[1], projection),
+            p=[1. / 6., 2. / 3., 1. / 6.],
         )
         print_err(f"Projecting to {projection}.")
-        return vectors @ projector
+        return vectors.astype(np.float32, copy=False) @ projector